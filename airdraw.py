@@ -1,13 +1,14 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-from scipy.spatial.distance import euclidean
-import glob
 import tkinter as tk
 from tkinter import Label, Button, Frame
 from PIL import Image, ImageTk, ImageDraw, ImageFont
 import random
 
+from gestures import handedness_label, recognize_gesture
+from governor import FrameRateGovernor, read_latest
+
 # MediaPipe setup
 mp_drawing = mp.solutions.drawing_utils
 mphands = mp.solutions.hands
@@ -21,44 +22,8 @@ QUOTES = [
     "This is a jumbo coffee morning."
 ]
 
-def normalize_landmarks(landmarks):
-    landmarks = np.array(landmarks).reshape(-1, 3)
-    origin = landmarks[0]
-    landmarks -= origin
-    max_val = np.max(np.abs(landmarks))
-    if max_val > 0:
-        landmarks /= max_val
-    return landmarks.flatten()
-
-def load_gesture_landmarks(gesture_name):
-    files = sorted(glob.glob(f"landmarks/{gesture_name}_landmarks*.npy"))
-    return [normalize_landmarks(np.load(f)) for f in files] if files else []
-
-GESTURES = {
-    "rock": load_gesture_landmarks("rock"),
-    "paper": load_gesture_landmarks("paper"),
-    "scissors": load_gesture_landmarks("scissors"),
-    "heart": load_gesture_landmarks("heart"),
-    "phone": load_gesture_landmarks("phone"),
-}
-
-def recognize_gesture(landmarks):
-    landmarks = normalize_landmarks(landmarks)
-    distances = {}
-    for gesture, refs in GESTURES.items():
-        if not refs:
-            continue
-        gesture_distances = [euclidean(landmarks, ref) for ref in refs]
-        distances[gesture] = sorted(gesture_distances)[:3]
-    averaged = {g: np.mean(d) for g, d in distances.items()}
-    best = min(averaged, key=averaged.get)
-    sorted_vals = sorted(averaged.values())
-    if len(sorted_vals) > 1 and sorted_vals[0] / sorted_vals[1] > 0.85:
-        return "Unknown", sorted_vals[0]
-    return best, averaged[best]
-
 class GestureApp:
-    def __init__(self, window):
+    def __init__(self, window, source=0):
         self.window = window
         self.window.title("☕ Stars Hollow Gesture App ☕")
         self.window.configure(bg="#fefae0")
@@ -131,19 +96,23 @@ class GestureApp:
         self.toggle_button.place(relx=0.98, rely=0.02, anchor="ne")
 
         self.menu_visible = True
-        self.cap = cv2.VideoCapture(0)
+        self.cap = cv2.VideoCapture(source)
         self.hands = mphands.Hands(
             static_image_mode=False,
             max_num_hands=1,
             min_detection_confidence=0.85,
             min_tracking_confidence=0.85
         )
+        self.governor = FrameRateGovernor(target_fps=30, cpu_percent=50, idle_after=5)
 
         self.current_frame = None
         self.overlay_text = ""
         self.overlay_step = -1
         self.overlay_result = ""
-        self.window.after(0, self.update)
+        self.overlay_font = None
+        self.countdown_job = None
+        self.clear_job = None
+        self.update_job = self.window.after(0, self.update)
 
  
 
@@ -157,10 +126,18 @@ class GestureApp:
         self.menu_visible = not self.menu_visible
 
     def update(self):
-        ret, frame = self.cap.read()
-        if not ret:
+        hand_present = self.process_frame()
+        if hand_present is None:
             return
+        self.update_job = self.window.after(self.governor.frame_finished(hand_present), self.update)
 
+    def process_frame(self):
+        """Read, recognise and show one frame. Returns whether a hand was seen, or None if the read failed."""
+        ret, frame = self.governor.read(self.cap)
+        if not ret:
+            return None
+
+        self.governor.frame_started()
         frame = cv2.flip(frame, 1)
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = self.hands.process(rgb)
@@ -169,10 +146,10 @@ class GestureApp:
         gesture = "Unknown"
         confidence = 0.0
         if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
+            for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
                 mp_drawing.draw_landmarks(display_frame, hand_landmarks, mphands.HAND_CONNECTIONS)
                 landmarks = [[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark]
-                gesture, confidence = recognize_gesture(landmarks)
+                gesture, confidence = recognize_gesture(landmarks, handedness_label(results, i))
                 break
 
         self.gesture_label.config(text=f"Gesture: {gesture}")
@@ -186,10 +163,7 @@ class GestureApp:
             img = Image.alpha_composite(img, overlay)
 
             draw = ImageDraw.Draw(img)
-            try:
-                font = ImageFont.truetype("Georgia.ttf", 80)
-            except:
-                font = ImageFont.truetype("arial.ttf", 80)
+            font = self.get_overlay_font()
 
             center = (img.width // 2, img.height // 2)
             text = self.overlay_text if self.overlay_step >= 0 else self.overlay_result
@@ -197,12 +171,34 @@ class GestureApp:
             draw.text((img.width - 70, img.height - 80), "☕", font=font, anchor="lt", fill="white")
 
         img = img.convert("RGB")
+        self.show_image(img)
+        return bool(results.multi_hand_landmarks)
+
+    def show_image(self, img):
+        # Paste into the existing PhotoImage when the size allows, so the
+        # kiosk doesn't allocate a new Tk image every frame
+        imgtk = getattr(self.video_frame, "imgtk", None)
+        if imgtk is not None and (imgtk.width(), imgtk.height()) == img.size:
+            imgtk.paste(img)
+            return
         imgtk = ImageTk.PhotoImage(image=img)
         self.video_frame.imgtk = imgtk
         self.video_frame.configure(image=imgtk)
-        self.window.after(10, self.update)
+
+    def get_overlay_font(self):
+        if self.overlay_font is None:
+            try:
+                self.overlay_font = ImageFont.truetype("Georgia.ttf", 80)
+            except:
+                self.overlay_font = ImageFont.truetype("arial.ttf", 80)
+        return self.overlay_font
 
     def start_countdown(self):
+        # Pressing start again restarts the countdown instead of stacking timers
+        for job in (self.countdown_job, self.clear_job):
+            if job is not None:
+                self.window.after_cancel(job)
+        self.countdown_job = self.clear_job = None
         self.result_label.config(text="")
         self.countdown_sequence = ["1", "2", "3", "THROW!"]
         self.overlay_result = ""
@@ -213,14 +209,16 @@ class GestureApp:
         if self.overlay_step < len(self.countdown_sequence):
             self.overlay_text = self.countdown_sequence[self.overlay_step]
             self.overlay_step += 1
-            self.window.after(1000, self.show_countdown_step)
+            self.countdown_job = self.window.after(1000, self.show_countdown_step)
         else:
+            self.countdown_job = None
             self.overlay_step = -1
             self.overlay_text = ""
             self.evaluate_throw()
 
     def evaluate_throw(self):
-        ret, latest = self.cap.read()
+        # Score what the player is showing now, not a frame queued while idling
+        ret, latest = read_latest(self.cap)
         if ret:
             latest = cv2.flip(latest, 1)
             self.current_frame = Image.fromarray(cv2.cvtColor(latest, cv2.COLOR_BGR2RGB))
@@ -234,9 +232,9 @@ class GestureApp:
 
         user_gesture = "Unknown"
         if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
+            for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
                 landmarks = [[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark]
-                user_gesture, _ = recognize_gesture(landmarks)
+                user_gesture, _ = recognize_gesture(landmarks, handedness_label(results, i))
                 break
 
         valid_gestures = ["rock", "paper", "scissors"]
@@ -260,9 +258,10 @@ class GestureApp:
             text=f"You: {user_gesture} | Computer: {computer_gesture}\n\n\u201c{quote}”"
         )
         self.overlay_result = result
-        self.window.after(2000, self.clear_overlay_result)
+        self.clear_job = self.window.after(2000, self.clear_overlay_result)
 
     def clear_overlay_result(self):
+        self.clear_job = None
         self.overlay_result = ""
 
     def close(self):
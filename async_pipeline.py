@@ -0,0 +1,166 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from gesture_service import FRAME_HEIGHT, FRAME_WIDTH, subscribe
+from governor import FrameRateGovernor
+
+
+class Latest:
+    """Single-slot mailbox between stages: put() overwrites, get() waits for something new.
+
+    A slow consumer skips stale items instead of building up a backlog, so
+    each stage always works on the freshest frame.
+    """
+
+    def __init__(self):
+        self._value = None
+        self._ready = asyncio.Event()
+
+    def put(self, value):
+        self._value = value
+        self._ready.set()
+
+    async def get(self):
+        await self._ready.wait()
+        self._ready.clear()
+        return self._value
+
+
+class GesturePipeline:
+    """Runs capture, inference, display and actions as separate asyncio tasks.
+
+    Blocking work stays off the event loop: cap.read() and analyze() each
+    get their own executor thread, and dispatch() runs on a third so slow OS
+    actions (pyautogui presses, window switching) never hold up frames.
+    Stages hand frames over through Latest mailboxes, so throughput is set
+    by the slowest stage rather than the sum of all of them.
+
+    analyze(frame) is called on the inference thread and returns
+    (hand_present, actions); it may draw on the frame. Each action is passed
+    to dispatch(action) in order. With headless=True nothing is shown and
+    the pipeline runs until stop() is called or the task is cancelled.
+
+    With service set to subscribe()'s (host, port, unix_path), the camera is
+    left to a running gesture_service so several apps can share it, and
+    analyze(event, frame) gets each decoded event plus a blank
+    FRAME_WIDTH x FRAME_HEIGHT frame to draw on.
+    """
+
+    def __init__(self, analyze, dispatch, window_name, camera=0, headless=False, governor=None, service=None):
+        self.analyze = analyze
+        self.dispatch = dispatch
+        self.window_name = window_name
+        self.camera = camera
+        self.headless = headless
+        self.service = service
+        self.governor = governor or FrameRateGovernor(target_fps=30, cpu_percent=50, idle_after=5)
+
+        self.frames = Latest()
+        self.display = Latest()
+        self.actions = None
+        self.cap = None
+        self._stopped = None
+        self._capture_pool = ThreadPoolExecutor(max_workers=1)
+        self._inference_pool = ThreadPoolExecutor(max_workers=1)
+        self._action_pool = ThreadPoolExecutor(max_workers=1)
+
+    def stop(self):
+        if self._stopped is not None:
+            self._stopped.set()
+
+    def read_frame(self):
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        return cv2.flip(frame, 1)
+
+    async def capture(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            frame = await loop.run_in_executor(self._capture_pool, self.read_frame)
+            if frame is None:
+                print("Camera read failed")
+                return
+            self.frames.put(frame)
+
+    async def receive(self):
+        async for event in subscribe(*self.service):
+            self.frames.put(event)
+        print("Gesture service closed the connection")
+
+    async def infer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.frames.get()
+            self.governor.frame_started()
+            if self.service is None:
+                frame = item
+                hand_present, actions = await loop.run_in_executor(self._inference_pool, self.analyze, frame)
+            else:
+                # Nothing to show but what analyze draws on a blank canvas
+                frame = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+                hand_present, actions = await loop.run_in_executor(self._inference_pool, self.analyze, item, frame)
+            for action in actions:
+                self.actions.put_nowait(action)
+            if not self.headless:
+                self.display.put(frame)
+            wait_ms = self.governor.frame_finished(hand_present)
+            await asyncio.sleep(wait_ms / 1000)
+
+    async def show(self):
+        while True:
+            try:
+                frame = await asyncio.wait_for(self.display.get(), timeout=0.05)
+            except asyncio.TimeoutError:
+                # Keep the window responsive while inference is idling
+                frame = None
+            if frame is not None:
+                cv2.putText(frame, self.governor.status(), (10, frame.shape[0] - 15),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+                cv2.imshow(self.window_name, frame)
+            # Exit when 'Esc' is pressed
+            if cv2.waitKey(1) & 0xFF == 27:
+                return
+
+    async def run_actions(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            action = await self.actions.get()
+            await loop.run_in_executor(self._action_pool, self.dispatch, action)
+
+    async def run(self):
+        self._stopped = asyncio.Event()
+        self.actions = asyncio.Queue()
+        if self.service is None:
+            self.cap = cv2.VideoCapture(self.camera)
+            source = self.capture()
+        else:
+            source = self.receive()
+
+        stages = [source, self.infer(), self.run_actions()]
+        if not self.headless:
+            stages.append(self.show())
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        for task in tasks:
+            # Any stage finishing (camera gone, Esc, an error) ends the pipeline
+            task.add_done_callback(lambda _: self._stopped.set())
+
+        try:
+            await self._stopped.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for pool in (self._capture_pool, self._inference_pool, self._action_pool):
+                pool.shutdown(wait=True)
+            if self.cap is not None:
+                self.cap.release()
+            if not self.headless:
+                cv2.destroyAllWindows()
+
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
@@ -0,0 +1,153 @@
+import argparse
+import glob
+import itertools
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+LANDMARK_DIR = "landmarks"
+AUGMENTED_DIR = os.path.join(LANDMARK_DIR, "augmented")
+MANIFEST = os.path.join(AUGMENTED_DIR, "manifest.json")
+
+# Hand-captured references, e.g. landmarks/paper_landmarks3.npy
+SOURCE_PATTERN = re.compile(r"^(?P<gesture>.+?)_landmarks\d*\.npy$")
+
+
+def find_sources(directory=LANDMARK_DIR):
+    sources = []
+    for path in sorted(glob.glob(os.path.join(directory, "*_landmarks*.npy"))):
+        if SOURCE_PATTERN.match(os.path.basename(path)):
+            sources.append(path)
+    return sources
+
+
+def variant_grid(rolls, tilts, scales, copies, jitter):
+    """Every combination of transforms to apply to each reference.
+
+    The untouched original is left out unless jitter makes it differ.
+    """
+    grid = []
+    for roll, tilt, scale in itertools.product([0.0] + rolls, [0.0] + tilts, [1.0] + scales):
+        identity = roll == 0 and tilt == 0 and scale == 1
+        if identity and jitter == 0:
+            continue
+        for _ in range(copies if jitter > 0 else 1):
+            grid.append({"roll": roll, "tilt": tilt, "scale": scale, "jitter": jitter})
+    return grid
+
+
+def augment(landmarks, grid, aspect, rng):
+    """Apply every transform in `grid` to one (21, 3) reference at once.
+
+    Landmarks are moved to the wrist and x is stretched by the frame aspect
+    ratio so rotations happen in square pixel space, then everything is
+    mapped back to MediaPipe's normalized image coordinates.
+    """
+    n = len(grid)
+    wrist = landmarks[0]
+    points = (landmarks - wrist) * np.array([aspect, 1.0, aspect])
+
+    roll = np.radians([g["roll"] for g in grid])
+    tilt = np.radians([g["tilt"] for g in grid])
+    scale = np.array([g["scale"] for g in grid])
+
+    # Roll is rotation in the image plane (about z), tilt turns the hand about
+    # its vertical axis (about y). Build one 3x3 matrix per variant.
+    cos_r, sin_r = np.cos(roll), np.sin(roll)
+    cos_t, sin_t = np.cos(tilt), np.sin(tilt)
+    zeros, ones = np.zeros(n), np.ones(n)
+    roll_m = np.stack([np.stack([cos_r, -sin_r, zeros], -1),
+                       np.stack([sin_r, cos_r, zeros], -1),
+                       np.stack([zeros, zeros, ones], -1)], 1)
+    tilt_m = np.stack([np.stack([cos_t, zeros, sin_t], -1),
+                       np.stack([zeros, ones, zeros], -1),
+                       np.stack([-sin_t, zeros, cos_t], -1)], 1)
+    transform = roll_m @ tilt_m * scale[:, None, None]
+
+    variants = np.einsum("vij,pj->vpi", transform, points)
+
+    sigma = np.array([g["jitter"] for g in grid]) * np.max(np.abs(points))
+    variants += rng.normal(size=variants.shape) * sigma[:, None, None]
+
+    return variants / np.array([aspect, 1.0, aspect]) + wrist
+
+
+def augment_file(job):
+    """Worker: augment one source file and write its variants. Returns manifest entries."""
+    index, path, grid, aspect, seed, out_dir = job
+    rng = np.random.default_rng([seed, index])
+    landmarks = np.load(path).reshape(-1, 3)
+    variants = augment(landmarks, grid, aspect, rng)
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    entries = {}
+    for v, (variant, params) in enumerate(zip(variants, grid)):
+        filename = os.path.join(out_dir, f"{stem}_aug{v:03d}.npy")
+        # Loaders only see *.npy, so running apps never read a half-written file
+        temp = filename + ".tmp"
+        with open(temp, "wb") as f:
+            np.save(f, variant.flatten())
+        os.replace(temp, filename)
+        entries[os.path.basename(filename)] = {"source": os.path.basename(path), **params}
+    return entries
+
+
+def clear_augmented(out_dir=AUGMENTED_DIR):
+    for path in glob.glob(os.path.join(out_dir, "*_aug*.npy")):
+        os.remove(path)
+
+
+def run(rolls, tilts, scales, copies, jitter, aspect, seed, workers):
+    sources = find_sources()
+    if not sources:
+        print(f"No references found in '{LANDMARK_DIR}'")
+        return
+
+    os.makedirs(AUGMENTED_DIR, exist_ok=True)
+    clear_augmented()
+
+    grid = variant_grid(rolls, tilts, scales, copies, jitter)
+    jobs = [(i, path, grid, aspect, seed, AUGMENTED_DIR) for i, path in enumerate(sources)]
+    manifest = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for entries in pool.map(augment_file, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))):
+            manifest.update(entries)
+
+    with open(MANIFEST + ".tmp", "w") as f:
+        json.dump({"seed": seed, "aspect": aspect, "variants": manifest}, f, indent=1, sort_keys=True)
+    os.replace(MANIFEST + ".tmp", MANIFEST)
+    print(f"Wrote {len(manifest)} variants of {len(sources)} references to '{AUGMENTED_DIR}'")
+
+
+def parse_floats(text):
+    return [float(v) for v in text.split(",") if v.strip()]
+
+
+if __name__ == "__main__":
+    # normalize_landmarks already removes in-plane rotation, scale and
+    # handedness, so by default only tilt and jitter add new information
+    parser = argparse.ArgumentParser(
+        description="Grow the reference set with transformed copies of every captured gesture",
+        epilog="There are no mirrored (other hand) variants: live left hands are mirrored into "
+               "right hands before matching, so a mirrored reference would never resemble a normalized "
+               "live sample and could only crowd out real neighbours.")
+    parser.add_argument("--rolls", type=parse_floats, default=[],
+                        help="in-plane rotations in degrees, comma separated")
+    parser.add_argument("--tilts", type=parse_floats, default=[-30.0, -15.0, 15.0, 30.0],
+                        help="rotations about the vertical axis in degrees, comma separated")
+    parser.add_argument("--scales", type=parse_floats, default=[])
+    parser.add_argument("--jitter", type=float, default=0.01,
+                        help="gaussian noise as a fraction of hand size")
+    parser.add_argument("--copies", type=int, default=1,
+                        help="jittered copies per transform")
+    parser.add_argument("--aspect", type=float, default=4 / 3,
+                        help="width / height of the camera frames the references came from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    run(args.rolls, args.tilts, args.scales, args.copies,
+        args.jitter, args.aspect, args.seed, args.workers)
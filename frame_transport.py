@@ -0,0 +1,263 @@
+import argparse
+import multiprocessing as mp
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Frame data starts on a cache-line boundary after the slot header
+HEADER_ALIGN = 64
+
+
+def _header_size(slots):
+    # latest seq + one seq per slot (int64), one publish timestamp per slot (float64)
+    size = (1 + slots) * 8 + slots * 8
+    return (size + HEADER_ALIGN - 1) // HEADER_ALIGN * HEADER_ALIGN
+
+
+def _attach_untracked(name):
+    """Open an existing segment without registering it with a resource tracker.
+
+    A registered segment is unlinked by the tracker when the attaching
+    process exits, which pulls it out from under the owner and every other
+    consumer; only the creating process should unlink it. Before 3.13 there
+    is no track=False, and unregistering afterwards is no better:
+    multiprocessing children share their parent's tracker, so that would
+    drop the owner's registration. Skip the register call instead.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class FrameRing:
+    """Ring of preallocated frame slots in shared memory.
+
+    One producer writes frames in place with acquire()/publish() and any number
+    of consumers read the newest frame as a NumPy view with latest(). Nothing
+    is copied or pickled. The writer never waits for readers: a consumer that
+    falls behind just sees the newest frame (latest wins), and can call
+    is_current(seq) after using a view to check it was not overwritten.
+    """
+
+    def __init__(self, shm, shape, dtype, slots, owner=False):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+        self.owner = owner
+
+        self._seqs = np.ndarray((1 + slots,), dtype=np.int64, buffer=shm.buf)
+        self._stamps = np.ndarray((slots,), dtype=np.float64, buffer=shm.buf,
+                                  offset=(1 + slots) * 8)
+        self._frames = np.ndarray((slots,) + self.shape, dtype=self.dtype,
+                                  buffer=shm.buf, offset=_header_size(slots))
+        self._writing = None
+
+    @classmethod
+    def create(cls, shape, dtype=np.uint8, slots=4, name=None):
+        """Allocate a new ring. The creating process owns (and unlinks) it."""
+        if slots < 2:
+            raise ValueError("a frame ring needs at least 2 slots")
+        frame_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        size = _header_size(slots) + slots * frame_bytes
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        ring = cls(shm, shape, dtype, slots, owner=True)
+        ring._seqs[:] = -1
+        ring._stamps[:] = 0.0
+        return ring
+
+    @classmethod
+    def attach(cls, name, shape, dtype, slots):
+        """Map an existing ring created by another process."""
+        return cls(_attach_untracked(name), shape, dtype, slots)
+
+    def spec(self):
+        """Picklable arguments for FrameRing.attach in a child process."""
+        return self.shm.name, self.shape, self.dtype.str, self.slots
+
+    # Producer side
+
+    def acquire(self):
+        """Return a writable view of the next slot.
+
+        Write the frame straight into it, e.g. cap.read(slot) followed by
+        cv2.flip(slot, 1, dst=slot), then call publish().
+        """
+        seq = int(self._seqs[0]) + 1
+        slot = seq % self.slots
+        # Mark the slot as being written so readers holding it can tell
+        self._seqs[1 + slot] = -1
+        self._writing = seq
+        return self._frames[slot]
+
+    def publish(self):
+        """Make the frame written into the acquired slot the latest one."""
+        if self._writing is None:
+            raise RuntimeError("publish() called without acquire()")
+        seq = self._writing
+        slot = seq % self.slots
+        self._stamps[slot] = time.perf_counter()
+        self._seqs[1 + slot] = seq
+        self._seqs[0] = seq
+        self._writing = None
+        return seq
+
+    def write(self, frame):
+        """Copy a frame into the ring (for sources that can't write in place)."""
+        np.copyto(self.acquire(), frame)
+        return self.publish()
+
+    # Consumer side
+
+    def latest(self, after=-1):
+        """Return (seq, view) of the newest frame, or (None, None).
+
+        Only frames newer than `after` are returned, so a consumer passing the
+        last seq it handled never processes the same frame twice.
+        """
+        seq = int(self._seqs[0])
+        if seq < 0 or seq <= after:
+            return None, None
+        return seq, self._frames[seq % self.slots]
+
+    def wait(self, after=-1, timeout=None, poll=0.001):
+        """Block until a frame newer than `after` is published."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            seq, frame = self.latest(after)
+            if seq is not None:
+                return seq, frame
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None, None
+            time.sleep(poll)
+
+    def is_current(self, seq):
+        """True if the slot holding `seq` has not been reused since it was read."""
+        return int(self._seqs[1 + seq % self.slots]) == seq
+
+    def timestamp(self, seq):
+        """time.perf_counter() at which `seq` was published."""
+        return float(self._stamps[seq % self.slots])
+
+    def close(self):
+        # Drop our views before unmapping, otherwise close() raises BufferError
+        self._seqs = self._stamps = self._frames = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                # Already removed by someone else; nothing left to clean up
+                pass
+
+
+# Micro-benchmark: shared-memory ring vs pickling frames through a Queue
+
+def _make_frames(shape, count=8):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, size=shape, dtype=np.uint8) for _ in range(count)]
+
+
+def _queue_producer(queue, shape, n_frames):
+    frames = _make_frames(shape)
+    for i in range(n_frames):
+        queue.put((time.perf_counter(), frames[i % len(frames)]))
+    queue.put(None)
+
+
+def _queue_consumer(queue, results):
+    latencies = []
+    start = None
+    while True:
+        item = queue.get()
+        if item is None:
+            break
+        sent, frame = item
+        if start is None:
+            start = time.perf_counter()
+        latencies.append(time.perf_counter() - sent)
+        frame[0, 0, 0]
+    results.put((len(latencies), time.perf_counter() - start, latencies))
+
+
+def _ring_producer(spec, n_frames, done):
+    ring = FrameRing.attach(*spec)
+    frames = _make_frames(ring.shape)
+    for i in range(n_frames):
+        np.copyto(ring.acquire(), frames[i % len(frames)])
+        ring.publish()
+    done.set()
+    ring.close()
+
+
+def _ring_consumer(spec, done, results):
+    ring = FrameRing.attach(*spec)
+    latencies = []
+    last = -1
+    start = None
+    while True:
+        seq, frame = ring.latest(last)
+        if seq is None:
+            if done.is_set() and ring.latest(last)[0] is None:
+                break
+            time.sleep(0.0001)
+            continue
+        if start is None:
+            start = time.perf_counter()
+        frame[0, 0, 0]
+        latencies.append(time.perf_counter() - ring.timestamp(seq))
+        last = seq
+    results.put((len(latencies), time.perf_counter() - start, latencies))
+    ring.close()
+
+
+def _report(name, n_sent, count, elapsed, latencies):
+    lat = np.array(latencies) * 1000
+    print(f"{name:>6}: {count}/{n_sent} frames delivered, "
+          f"{count / elapsed:8.1f} frames/s, "
+          f"latency mean {lat.mean():6.2f} ms, p95 {np.percentile(lat, 95):6.2f} ms")
+
+
+def benchmark(shape=(1080, 1920, 3), n_frames=300, slots=4):
+    results = mp.Queue()
+
+    queue = mp.Queue(maxsize=slots)
+    procs = [mp.Process(target=_queue_producer, args=(queue, shape, n_frames)),
+             mp.Process(target=_queue_consumer, args=(queue, results))]
+    for p in procs:
+        p.start()
+    count, elapsed, latencies = results.get()
+    for p in procs:
+        p.join()
+    _report("queue", n_frames, count, elapsed, latencies)
+
+    ring = FrameRing.create(shape, np.uint8, slots)
+    done = mp.Event()
+    try:
+        consumer = mp.Process(target=_ring_consumer, args=(ring.spec(), done, results))
+        producer = mp.Process(target=_ring_producer, args=(ring.spec(), n_frames, done))
+        consumer.start()
+        producer.start()
+        count, elapsed, latencies = results.get()
+        producer.join()
+        consumer.join()
+    finally:
+        ring.close()
+    _report("ring", n_frames, count, elapsed, latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark shared-memory frame transport against a multiprocessing.Queue")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+    benchmark((args.height, args.width, 3), args.frames, args.slots)
@@ -0,0 +1,281 @@
+import argparse
+import asyncio
+import struct
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from gestures import handedness_label, recognize_gesture
+from governor import FrameRateGovernor
+
+# MediaPipe setup
+mphands = mp.solutions.hands
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Wire format (little endian). Every message is a uint32 payload length
+# followed by the payload:
+#   uint32 seq, float64 capture time (epoch seconds), float32 confidence,
+#   float32 service fps, float32 service duty cycle,
+#   uint8 flags, uint8 gesture name length, gesture name (utf-8),
+#   then 21 x 3 float32 landmarks if FLAG_HAND is set.
+LENGTH = struct.Struct("<I")
+EVENT_HEADER = struct.Struct("<IdfffBB")
+FLAG_HAND = 1
+FLAG_LEFT = 2
+FLAG_PRESENCE = 4  # the service's governor is in low-rate presence mode
+NUM_LANDMARKS = 21
+
+# Consumers that get landmarks instead of camera frames scale them to this
+# size, OpenCV's default capture resolution
+FRAME_WIDTH = 640
+FRAME_HEIGHT = 480
+
+Landmark = namedtuple("Landmark", "x y z")
+
+
+def encode_event(seq, timestamp, gesture=None, confidence=0.0, landmarks=None, handedness=None,
+                 presence=False, fps=0.0, duty=0.0):
+    """Pack one event. landmarks=None means the hand has left the frame."""
+    flags = FLAG_PRESENCE if presence else 0
+    body = b""
+    if landmarks is not None:
+        flags |= FLAG_HAND
+        body = np.asarray(landmarks, dtype="<f4").reshape(NUM_LANDMARKS * 3).tobytes()
+    if handedness == "Left":
+        flags |= FLAG_LEFT
+    name = (gesture or "").encode("utf-8")
+    payload = EVENT_HEADER.pack(seq, timestamp, confidence, fps, duty, flags, len(name)) + name + body
+    return LENGTH.pack(len(payload)) + payload
+
+
+def decode_event(payload):
+    """Unpack a payload (without its length prefix) into a dict."""
+    seq, timestamp, confidence, fps, duty, flags, name_len = EVENT_HEADER.unpack_from(payload)
+    offset = EVENT_HEADER.size
+    gesture = payload[offset:offset + name_len].decode("utf-8") or None
+    offset += name_len
+    landmarks = None
+    handedness = None
+    if flags & FLAG_HAND:
+        landmarks = np.frombuffer(payload, dtype="<f4", count=NUM_LANDMARKS * 3,
+                                  offset=offset).reshape(NUM_LANDMARKS, 3)
+        handedness = "Left" if flags & FLAG_LEFT else "Right"
+    return {
+        "seq": seq,
+        "timestamp": timestamp,
+        "gesture": gesture,
+        "confidence": confidence,
+        "hand": bool(flags & FLAG_HAND),
+        "handedness": handedness,
+        "landmarks": landmarks,
+        "service_state": FrameRateGovernor.PRESENCE if flags & FLAG_PRESENCE else FrameRateGovernor.ACTIVE,
+        "service_fps": fps,
+        "service_duty": duty,
+    }
+
+
+def event_landmarks(event):
+    """An event's landmarks as a list of (x, y, z) points with MediaPipe's .x/.y/.z access, or None."""
+    if event["landmarks"] is None:
+        return None
+    return [Landmark(*point) for point in event["landmarks"].tolist()]
+
+
+class Client:
+    """One connected consumer with its own bounded outbox.
+
+    A slow client never stalls inference or the other clients: when its
+    outbox is full the oldest event is dropped to make room for the newest.
+    """
+
+    def __init__(self, writer, max_pending):
+        self.writer = writer
+        self.outbox = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+
+    def offer(self, message):
+        if self.outbox.full():
+            self.outbox.get_nowait()
+            self.dropped += 1
+        self.outbox.put_nowait(message)
+
+    async def pump(self):
+        while True:
+            message = await self.outbox.get()
+            self.writer.write(message)
+            await self.writer.drain()
+
+
+class GestureService:
+    """Owns the camera and the hand model and streams events to clients."""
+
+    def __init__(self, camera=0, max_pending=8):
+        self.camera = camera
+        self.max_pending = max_pending
+        self.clients = set()
+        self.seq = 0
+        self.hand_was_present = False
+        self.cap = None
+        self.hands = None
+        # MediaPipe graphs aren't thread safe, so inference stays on one worker
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # Connected clients don't mean anyone is in front of the camera
+        self.governor = FrameRateGovernor(target_fps=30, cpu_percent=50, idle_after=5)
+
+    def process_next(self):
+        """Capture and analyse one frame. Runs on the executor thread."""
+        ret, frame = self.governor.read(self.cap)
+        if not ret:
+            return None, None
+        self.governor.frame_started()
+        frame = cv2.flip(frame, 1)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = self.hands.process(rgb)
+        timestamp = time.time()
+
+        if results.multi_hand_landmarks:
+            hand_landmarks = results.multi_hand_landmarks[0]
+            handedness = handedness_label(results)
+            landmarks = [[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark]
+            gesture, confidence = recognize_gesture(landmarks, handedness)
+            self.hand_was_present = True
+            return True, (timestamp, gesture, float(confidence), landmarks, handedness)
+
+        if self.hand_was_present:
+            # Tell consumers once that the hand is gone instead of every frame
+            self.hand_was_present = False
+            return True, (timestamp, None, 0.0, None, None)
+        return True, None
+
+    def publish(self, event):
+        governor = self.governor
+        message = encode_event(self.seq, *event, presence=governor.state == governor.PRESENCE,
+                               fps=governor.measured_fps, duty=governor.duty_cycle)
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        for client in self.clients:
+            client.offer(message)
+
+    async def run_inference(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.clients:
+                # Nobody is listening, so don't spend a core on inference
+                await asyncio.sleep(0.1)
+                continue
+            ret, event = await loop.run_in_executor(self.executor, self.process_next)
+            if not ret:
+                print("Camera read failed, stopping service")
+                return
+            state = self.governor.state
+            wait_ms = self.governor.frame_finished(self.hand_was_present)
+            if self.governor.state != state:
+                print(f"Governor: {self.governor.status()}")
+                if event is None:
+                    # Let consumers see the drop to presence mode
+                    event = (time.time(), None, 0.0, None, None)
+            if event is not None:
+                self.publish(event)
+            await asyncio.sleep(wait_ms / 1000)
+
+    @staticmethod
+    async def discard_input(reader):
+        # Clients have nothing to say; throw away anything they send in small
+        # chunks so a chatty client can't make the daemon buffer it all
+        while await reader.read(4096):
+            pass
+
+    async def handle_client(self, reader, writer):
+        client = Client(writer, self.max_pending)
+        self.clients.add(client)
+        peer = writer.get_extra_info("peername") or "unix socket"
+        print(f"Client connected: {peer}")
+        pump = asyncio.ensure_future(client.pump())
+        eof = asyncio.ensure_future(self.discard_input(reader))
+        try:
+            # Clients only listen; either side finishing means the connection is done
+            await asyncio.wait([pump, eof], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.clients.discard(client)
+            pump.cancel()
+            eof.cancel()
+            writer.close()
+            print(f"Client disconnected: {peer} ({client.dropped} events dropped)")
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        self.cap = cv2.VideoCapture(self.camera)
+        self.hands = mphands.Hands(
+            static_image_mode=False,
+            max_num_hands=1,
+            min_detection_confidence=0.85,
+            min_tracking_confidence=0.85
+        )
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+            print(f"Gesture service listening on {unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            print(f"Gesture service listening on {host}:{port}")
+
+        try:
+            async with server:
+                await self.run_inference()
+        finally:
+            self.cap.release()
+            self.hands.close()
+            self.executor.shutdown(wait=False)
+
+
+async def subscribe(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+    """Async generator yielding decoded events from a running service."""
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            try:
+                header = await reader.readexactly(LENGTH.size)
+            except asyncio.IncompleteReadError:
+                return
+            (length,) = LENGTH.unpack(header)
+            yield decode_event(await reader.readexactly(length))
+    finally:
+        writer.close()
+
+
+async def watch(host, port, unix_path):
+    async for event in subscribe(host, port, unix_path):
+        status = (f"[{event['service_state']} | {event['service_fps']:.1f} fps | "
+                  f"duty {event['service_duty'] * 100:.0f}%]")
+        if event["hand"]:
+            print(f"#{event['seq']} {event['gesture']} ({event['confidence']:.2f}) {event['handedness']} hand {status}")
+        else:
+            print(f"#{event['seq']} no hand {status}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local gesture recognition service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="serve on this Unix socket path instead of TCP")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--max-pending", type=int, default=8,
+                        help="events buffered per client before the oldest are dropped")
+    parser.add_argument("--watch", action="store_true",
+                        help="connect to a running service and print its events")
+    args = parser.parse_args()
+
+    try:
+        if args.watch:
+            asyncio.run(watch(args.host, args.port, args.unix))
+        else:
+            service = GestureService(args.camera, args.max_pending)
+            asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
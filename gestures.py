@@ -0,0 +1,303 @@
+import numpy as np
+import glob
+import os
+import threading
+import time
+from collections import OrderedDict
+
+NUM_LANDMARKS = 21
+WRIST = 0
+MIDDLE_MCP = 9
+
+# MediaPipe x/y are fractions of frame width/height; stretching x (and z,
+# which MediaPipe scales like x) by the aspect ratio makes rotations rigid.
+FRAME_ASPECT = 4 / 3
+_ASPECT_SCALE = np.array([FRAME_ASPECT, 1.0, FRAME_ASPECT])
+
+class NormalizeWorkspace:
+    """Output and scratch arrays for normalizing batches of `n` hands.
+
+    Passing the same workspace to every normalize_landmarks_batch() call of
+    that size keeps the call from allocating any arrays of its own.
+    """
+
+    def __init__(self, n=1):
+        self.out = np.empty((n, NUM_LANDMARKS, 3))
+        self.x = np.empty((n, NUM_LANDMARKS))
+        self.product = np.empty((n, NUM_LANDMARKS))
+        self.length = np.empty(n)
+        self.ux = np.empty(n)
+        self.uy = np.empty(n)
+        self.max_val = np.empty(n)
+        self.min_val = np.empty(n)
+
+def normalize_landmarks_batch(landmarks, handedness=None, out=None, workspace=None):
+    """Normalize a batch of hands into `out`, shape (N, 21, 3).
+
+    Each hand is moved so the wrist is at the origin, left hands are
+    mirrored into right hands, the hand is rotated in the image plane so the
+    wrist to middle-MCP axis points straight up, and the result is scaled
+    so its largest coordinate is 1. `handedness` is one MediaPipe label
+    ("Left"/"Right") for the whole batch or one per hand; None means the
+    hands are treated as right hands, as the stored references are.
+
+    `out` defaults to workspace.out; without a workspace, one is allocated.
+    """
+    landmarks = np.asarray(landmarks, dtype=float).reshape(-1, NUM_LANDMARKS, 3)
+    n = len(landmarks)
+    if workspace is None:
+        workspace = NormalizeWorkspace(n)
+    if out is None:
+        out = workspace.out
+
+    np.subtract(landmarks, landmarks[:, WRIST:WRIST + 1], out=out)
+    out *= _ASPECT_SCALE
+
+    if isinstance(handedness, str):
+        if handedness == "Left":
+            out[:, :, 0] *= -1
+    elif handedness is not None:
+        for i, label in enumerate(handedness):
+            if label == "Left":
+                out[i, :, 0] *= -1
+
+    # Rotate so the unit wrist->middle-MCP vector u lands on (0, -1), i.e. up
+    # in image coordinates: x' = ux*y - uy*x, y' = -(ux*x + uy*y)
+    axis = out[:, MIDDLE_MCP, :2]
+    length, ux, uy = workspace.length, workspace.ux, workspace.uy
+    np.hypot(axis[:, 0], axis[:, 1], out=length)
+    degenerate = None
+    if not length.all():
+        # No axis when the middle MCP sits on the wrist; leave those unrotated
+        degenerate = length == 0
+        length[degenerate] = 1
+    np.divide(axis[:, 0], length, out=ux)
+    np.divide(axis[:, 1], length, out=uy)
+    if degenerate is not None:
+        uy[degenerate] = -1
+
+    x, y, product = workspace.x, out[:, :, 1], workspace.product
+    np.copyto(x, out[:, :, 0])
+    np.multiply(x, uy[:, None], out=product)
+    np.multiply(y, ux[:, None], out=out[:, :, 0])
+    out[:, :, 0] -= product
+    np.multiply(x, ux[:, None], out=product)
+    y *= uy[:, None]
+    y += product
+    np.negative(y, out=y)
+
+    # Largest |coordinate| per hand, without an np.abs(out) temporary
+    max_val, min_val = workspace.max_val, workspace.min_val
+    np.max(out, axis=(1, 2), out=max_val)
+    np.min(out, axis=(1, 2), out=min_val)
+    np.negative(min_val, out=min_val)
+    np.maximum(max_val, min_val, out=max_val)
+    if not max_val.all():
+        max_val[max_val == 0] = 1
+    out /= max_val[:, None, None]
+    return out
+
+def normalize_landmarks(landmarks, handedness=None, out=None, workspace=None):
+    """Normalize one hand; returns a flat (63,) view of `out`."""
+    if out is not None:
+        out = out.reshape(1, NUM_LANDMARKS, 3)
+    return normalize_landmarks_batch(landmarks, handedness, out, workspace).reshape(-1)
+
+def load_gesture_landmarks(gesture_name):
+    # Hand-captured references plus any variants from augment_landmarks.py
+    files = sorted(glob.glob(f"landmarks/{gesture_name}_landmarks*.npy") +
+                   glob.glob(f"landmarks/augmented/{gesture_name}_landmarks*.npy"))
+    if not files:
+        return []
+    refs = normalize_landmarks_batch(np.stack([np.load(f) for f in files]))
+    return list(refs.reshape(len(files), -1))
+
+def handedness_label(results, index=0):
+    """MediaPipe's "Left"/"Right" label for a detected hand, or None."""
+    if results.multi_handedness:
+        return results.multi_handedness[index].classification[0].label
+    return None
+
+# Only reload_gestures() should change this; recognition caches depend on it
+GESTURES = {
+    "rock": load_gesture_landmarks("rock"),
+    "paper": load_gesture_landmarks("paper"),
+    "scissors": load_gesture_landmarks("scissors"),
+    "heart": load_gesture_landmarks("heart"),
+    "phone": load_gesture_landmarks("phone"),
+}
+
+# Number of closest references averaged into each class score
+TOP_K = 3
+
+def stack_references(gestures):
+    """One (n, 63) array per class, so a class is scored with a single vectorized distance pass."""
+    return {gesture: np.array(refs) for gesture, refs in gestures.items() if refs}
+
+GESTURE_REFS = stack_references(GESTURES)
+
+# Bumped whenever the reference set changes; cached results carry it
+REFERENCE_VERSION = 0
+
+def reload_gestures():
+    """Re-read every reference from disk, e.g. after saving or augmenting landmarks."""
+    global GESTURE_REFS, REFERENCE_VERSION
+    loaded = {gesture: load_gesture_landmarks(gesture) for gesture in GESTURES}
+    refs = stack_references(loaded)
+    with _RECOGNIZE_LOCK:
+        GESTURES.update(loaded)
+        GESTURE_REFS = refs
+        REFERENCE_VERSION += 1
+
+# saving_landmarks.py adds new files and augment_landmarks.py rewrites its
+# manifest on every run, so these mtimes change whenever the references do
+REFERENCE_PATHS = ["landmarks", "landmarks/augmented", "landmarks/augmented/manifest.json"]
+RELOAD_CHECK_INTERVAL = 2.0
+
+def reference_stamp():
+    stamp = []
+    for path in REFERENCE_PATHS:
+        try:
+            stamp.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+_reference_stamp = reference_stamp()
+_failed_stamp = None
+_next_reload_check = time.monotonic() + RELOAD_CHECK_INTERVAL
+
+def reload_if_changed():
+    """Reload the references if they changed on disk, checking at most every RELOAD_CHECK_INTERVAL seconds."""
+    global _reference_stamp, _failed_stamp, _next_reload_check
+    now = time.monotonic()
+    if now < _next_reload_check:
+        return False
+    _next_reload_check = now + RELOAD_CHECK_INTERVAL
+    stamp = reference_stamp()
+    if stamp == _reference_stamp:
+        return False
+    try:
+        reload_gestures()
+    except (OSError, ValueError, EOFError) as e:
+        # Most likely a file still being written; keep matching against the
+        # current references and retry at the next check
+        if stamp != _failed_stamp:
+            print(f"Keeping current gesture references, reload failed: {e}")
+            _failed_stamp = stamp
+        return False
+    # Only now, so a failed or partial load is retried
+    _reference_stamp = stamp
+    return True
+
+def top_k_mean(distances):
+    """Mean of the TOP_K smallest distances."""
+    k = min(TOP_K, len(distances))
+    return np.partition(distances, k - 1)[:k].mean()
+
+class ResultCache:
+    """Bounded LRU of recognition results keyed by quantized normalized landmarks.
+
+    A held pose produces slightly different landmarks every frame, so keys
+    round each coordinate to `step`. Larger steps hit more often but let
+    poses that differ by up to about a step per coordinate share an answer.
+    The cache empties itself when it sees a new REFERENCE_VERSION.
+
+    The key is not a pure function of the current pose: while the hand
+    stays within `hysteresis` steps of the anchor pose, the anchor's key is
+    reused. So an answer can come from a pose up to (2 * hysteresis + 1) *
+    step away per coordinate (0.15 with the defaults), and the returned
+    distance can be off by up to the Euclidean norm of that difference. In
+    practice only near-ties are affected. On slow, jittered morphs between
+    two reference poses, about 1-2% of frames got a different label than an
+    uncached match, and the distance was off by up to about 0.15.
+    """
+
+    def __init__(self, maxsize=256, step=0.05, hysteresis=1.0):
+        self.maxsize = maxsize
+        self.step = step
+        self.hysteresis = hysteresis
+        self._anchor = None
+        self._anchor_key = None
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, landmarks):
+        scaled = landmarks / self.step
+        # With 63 coordinates jitter pushes some coordinate across a bucket
+        # edge almost every frame, so keep using the last key while the hand
+        # stays within `hysteresis` steps of the pose that produced it
+        if self._anchor is not None and np.max(np.abs(scaled - self._anchor)) <= self.hysteresis:
+            return self._anchor_key
+        self._anchor = scaled.copy()
+        self._anchor_key = np.round(scaled).astype(np.int16).tobytes()
+        return self._anchor_key
+
+    def get(self, key, version):
+        if version != self.version:
+            self.clear()
+            self.version = version
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self._anchor = None
+        self._anchor_key = None
+
+    def info(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+RESULT_CACHE = ResultCache()
+
+def match_gesture(landmarks):
+    """Classify an already normalized (63,) landmark vector against the references."""
+    averaged = {gesture: top_k_mean(np.linalg.norm(refs - landmarks, axis=1))
+                for gesture, refs in GESTURE_REFS.items()}
+
+    best = min(averaged, key=averaged.get)
+    sorted_vals = sorted(averaged.values())
+
+    if len(sorted_vals) > 1 and sorted_vals[0] / sorted_vals[1] > 0.85:
+        return "Unknown", sorted_vals[0]
+
+    return best, averaged[best]
+
+# Reused for every live sample so recognition doesn't allocate per frame.
+# It and RESULT_CACHE are shared, so recognition holds _RECOGNIZE_LOCK.
+_WORKSPACE = NormalizeWorkspace(1)
+_RECOGNIZE_LOCK = threading.Lock()
+
+def recognize_gesture(landmarks, handedness=None):
+    """Classify one hand's raw landmarks. Threads calling this at once take turns."""
+    reload_if_changed()
+    with _RECOGNIZE_LOCK:
+        landmarks = normalize_landmarks(landmarks, handedness, workspace=_WORKSPACE)
+        key = RESULT_CACHE.key(landmarks)
+        result = RESULT_CACHE.get(key, REFERENCE_VERSION)
+        if result is None:
+            result = match_gesture(landmarks)
+            RESULT_CACHE.put(key, result)
+        return result
@@ -0,0 +1,98 @@
+import time
+
+
+def read_latest(cap, max_drain=8, live_after=0.01):
+    """cap.read() that first throws away frames the backend queued while nobody was reading.
+
+    Queued frames come back from grab() almost at once; the first grab that
+    takes longer than `live_after` seconds had to wait for the camera, so
+    that frame is current. With a video file every grab is quick and up to
+    `max_drain` frames are skipped, as a live camera would have done.
+    """
+    for _ in range(max_drain):
+        start = time.perf_counter()
+        if not cap.grab():
+            return False, None
+        if time.perf_counter() - start > live_after:
+            break
+    return cap.retrieve()
+
+
+class FrameRateGovernor:
+    """Paces a capture/inference loop against an FPS target and a CPU budget.
+
+    Call frame_started() once the frame has been read and frame_finished()
+    when it has been processed; frame_finished() returns how many
+    milliseconds to wait before the next frame (for window.after or
+    cv2.waitKey). While no hand has been seen for `idle_after` seconds the
+    governor drops to `presence_fps`, just fast enough to notice a hand
+    coming back, and returns to full rate on the first frame with a hand.
+    """
+
+    ACTIVE = "active"
+    PRESENCE = "presence"
+
+    def __init__(self, target_fps=30, cpu_percent=50, idle_after=5.0, presence_fps=2, smoothing=0.2):
+        self.target_fps = target_fps
+        self.cpu_fraction = cpu_percent / 100
+        self.idle_after = idle_after
+        self.presence_fps = presence_fps
+        self.smoothing = smoothing
+
+        self.state = self.ACTIVE
+        self.busy_time = 0.0      # smoothed seconds of work per frame
+        self.duty_cycle = 0.0     # smoothed fraction of wall time spent working
+        self.measured_fps = 0.0
+        self.delay = 0.0          # seconds the last frame_finished() asked to wait
+
+        now = time.perf_counter()
+        self.last_hand_time = now
+        self._frame_start = None
+        self._prev_frame_start = None
+        self._last_busy = 0.0
+
+    def _smooth(self, old, new):
+        return new if old == 0.0 else old + self.smoothing * (new - old)
+
+    def frame_started(self):
+        now = time.perf_counter()
+        if self._prev_frame_start is not None:
+            interval = now - self._prev_frame_start
+            if interval > 0:
+                self.measured_fps = self._smooth(self.measured_fps, 1 / interval)
+                self.duty_cycle = self._smooth(self.duty_cycle, min(1.0, self._last_busy / interval))
+        self._prev_frame_start = now
+        self._frame_start = now
+
+    def read(self, cap):
+        """cap.read(), skipping frames the camera queued during a long presence-mode wait."""
+        if self.state == self.PRESENCE:
+            return read_latest(cap)
+        return cap.read()
+
+    def frame_finished(self, hand_present):
+        """Record the frame's work and return the wait in whole milliseconds (>= 1)."""
+        now = time.perf_counter()
+        if self._frame_start is None:
+            self._frame_start = now
+        busy = now - self._frame_start
+
+        if hand_present:
+            self.last_hand_time = now
+            self.state = self.ACTIVE
+        elif now - self.last_hand_time >= self.idle_after:
+            self.state = self.PRESENCE
+
+        fps = self.target_fps if self.state == self.ACTIVE else self.presence_fps
+        self.busy_time = self._smooth(self.busy_time, busy)
+        # Stretch the frame period until the work fits inside the CPU budget
+        period = max(1 / fps, self.busy_time / self.cpu_fraction)
+        self.delay = max(0.0, period - busy)
+        self._last_busy = busy
+
+        self._frame_start = None
+        return max(1, int(round(self.delay * 1000)))
+
+    def status(self):
+        return (f"{self.state} | {self.measured_fps:.1f} fps | "
+                f"duty {self.duty_cycle * 100:.0f}%")
@@ -45,7 +45,12 @@ def save_landmarks(gesture_name, landmarks):
     """Save landmarks to a numbered .npy file."""
     landmarks = np.array(landmarks).flatten()
     filename = get_next_filename(gesture_name)
-    np.save(filename, landmarks)
+    # Write under a name the loaders ignore, then rename, so running apps
+    # never pick up a half-written file
+    temp = filename + ".tmp"
+    with open(temp, "wb") as f:
+        np.save(f, landmarks)
+    os.replace(temp, filename)
     print(f"Landmarks for '{gesture_name}' saved as '{filename}'!")
 
 while True:
@@ -1,3 +1,5 @@
+import argparse
+import asyncio
 import cv2
 import mediapipe as mp
 import math
@@ -6,6 +8,10 @@ import time
 import pygetwindow as gw
 from collections import deque
 
+from async_pipeline import GesturePipeline
+from gesture_service import DEFAULT_HOST, DEFAULT_PORT, event_landmarks
+from swipe_direction import DirectionClassifier
+
 # Window application names
 apps = ["Edge", "Spotify", "Discord"]
 window_names = {
@@ -13,24 +19,17 @@ window_names = {
     "Spotify": "spotify",
     "Discord": "discord"
 }
-current_app_index = 0
-media_playing = False
 
 # MediaPipe setup
 mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=1)
 mp_draw = mp.solutions.drawing_utils
 
-trail = deque(maxlen=5)
 movement_threshold = 40
 idle_threshold = 15
 entry_ignore_frames = 10  # ignore this many frames after hand appears
-entry_frame_counter = 0
-hand_was_present = False
-last_action_time = time.time()
 cooldown = 1
 
-cap = cv2.VideoCapture(0)
+SWIPE_DIRECTIONS = DirectionClassifier(8)
 
 def switch_to(app_title):
     for win in gw.getAllWindows():
@@ -40,7 +39,7 @@ def switch_to(app_title):
             try:
                 print(f"Switching to {app_title} window")
                 # In case it's minimized
-                win.restore() 
+                win.restore()
                 win.activate()
                 return True
             except:
@@ -48,138 +47,178 @@ def switch_to(app_title):
     print(f"Window containing '{app_title}' not found.")
     return False
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    frame = cv2.flip(frame, 1)
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb)
 
-    if results.multi_hand_landmarks:
-        if not hand_was_present:
-            entry_frame_counter = 0
-            hand_was_present = True
+class AppSwitcher:
+    def __init__(self, detect=True):
+        # With detect=False hands come from gesture_service, so skip the model
+        self.hands = mp_hands.Hands(max_num_hands=1) if detect else None
+        self.trail = deque(maxlen=5)
+        self.entry_frame_counter = 0
+        self.hand_was_present = False
+        self.last_action_time = time.time()
+        self.current_app_index = 0
+        self.media_playing = False
+
+    def analyze(self, frame):
+        """Find the hand in a camera frame and track it. Runs on the inference thread."""
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = self.hands.process(rgb)
+        if not results.multi_hand_landmarks:
+            return self.track(None, frame)
+        handLms = results.multi_hand_landmarks[0]
+        return self.track(handLms.landmark, frame, handLms)
+
+    def analyze_event(self, event, frame):
+        """Track the hand from a gesture_service event. Runs on the inference thread."""
+        return self.track(event_landmarks(event), frame)
+
+    def track(self, landmarks, frame, handLms=None):
+        """Turn swipes into actions; landmarks is None when no hand is visible."""
+        actions = []
+
+        if landmarks is None:
+            self.hand_was_present = False
+            return False, actions
+
+        if not self.hand_was_present:
+            self.entry_frame_counter = 0
+            self.hand_was_present = True
         else:
-            entry_frame_counter += 1
+            self.entry_frame_counter += 1
 
-        if entry_frame_counter < entry_ignore_frames:
+        if self.entry_frame_counter < entry_ignore_frames:
             cv2.putText(frame, "Ignoring hand (just appeared)", (10, 140),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 100, 255), 2)
-            cv2.imshow("Gesture App Switcher", frame)
-            continue
+            return True, actions
 
-        for handLms in results.multi_hand_landmarks:
-            h, w, _ = frame.shape
-            landmarks = handLms.landmark
+        h, w, _ = frame.shape
 
-            fingers = []
-            fingers.append(1 if landmarks[8].y < landmarks[6].y else 0)
-            fingers.append(1 if landmarks[12].y < landmarks[10].y else 0)
-            fingers.append(1 if landmarks[16].y < landmarks[14].y else 0)
-            fingers.append(1 if landmarks[20].y < landmarks[18].y else 0)
-            fingers.append(1 if landmarks[4].x < landmarks[3].x else 0)
-            finger_count = sum(fingers)
+        fingers = []
+        fingers.append(1 if landmarks[8].y < landmarks[6].y else 0)
+        fingers.append(1 if landmarks[12].y < landmarks[10].y else 0)
+        fingers.append(1 if landmarks[16].y < landmarks[14].y else 0)
+        fingers.append(1 if landmarks[20].y < landmarks[18].y else 0)
+        fingers.append(1 if landmarks[4].x < landmarks[3].x else 0)
+        finger_count = sum(fingers)
 
-            index_tip = landmarks[8]
-            cx, cy = int(index_tip.x * w), int(index_tip.y * h)
-            trail.append((cx, cy))
+        index_tip = landmarks[8]
+        cx, cy = int(index_tip.x * w), int(index_tip.y * h)
+        self.trail.append((cx, cy))
 
+        if handLms is not None:
             mp_draw.draw_landmarks(frame, handLms, mp_hands.HAND_CONNECTIONS)
 
-            if len(trail) == trail.maxlen:
-                x1, y1 = trail[0]
-                x2, y2 = trail[-1]
-                dx, dy = x2 - x1, y2 - y1
-                distance = math.hypot(dx, dy)
-
-                cv2.putText(frame, f"Movement: {int(distance)} px", (10, 110),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
-
-                angle = math.degrees(math.atan2(-dy, dx))
-                angle = (angle + 360) % 360
-                direction = None
-
-                # Determine direction based on angle
-                if 22.5 <= angle < 67.5:
-                    direction = "Up-Right"
-                elif 247.5 <= angle < 292.5:
-                    direction = "Down"
-                elif 337.5 <= angle or angle < 22.5:
-                    direction = "Right"
-                elif 67.5 <= angle < 112.5:
-                    direction = "Up"
-                elif 157.5 <= angle < 202.5:
-                    direction = "Left"
-                elif 202.5 <= angle < 247.5:
-                    direction = "Down-Left"
-
-                now = time.time()
-                if now - last_action_time > cooldown:
-                    # Check if all fingers are up
-                    if finger_count == 5:
-                        if distance > idle_threshold:
-                            # Change application based on direction
-                            if direction == "Right":
-                                print("Switching to next app (5-finger swipe)")
-                                current_app_index = (current_app_index + 1) % len(apps)
-                                switch_to(window_names[apps[current_app_index]])
-                            elif direction == "Left":
-                                print("Switching to previous app (5-finger swipe)")
-                                current_app_index = (current_app_index - 1) % len(apps)
-                                switch_to(window_names[apps[current_app_index]])
-                            last_action_time = now
-                        else:
-                            # Idle state with all fingers up
-                            trail.clear()
-                            cv2.putText(frame, "Idle: All fingers up", (10, 80),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-                    elif finger_count < 5:
-                        if distance > idle_threshold:
-                            # Perform actions based direction
-                            if direction == "Up" and fingers[0]:
-                                for _ in range(5):
-                                    pyautogui.press("volumeup")
-                                last_action_time = now
-                            elif direction == "Down" and fingers[0]:
-                                for _ in range(5):
-                                    pyautogui.press("volumedown")
-                                last_action_time = now
-                            elif direction == "Up-Right" and fingers[0]:
-                                if not media_playing:
-                                    pyautogui.press("playpause")
-                                    media_playing = True
-                                    print("Playing video")
-                                else:
-                                    print("Already playing")
-                                last_action_time = now
-                            elif direction == "Down-Left" and fingers[0]:
-                                if media_playing:
-                                    pyautogui.press("playpause")
-                                    media_playing = False
-                                    print("Pausing video")
-                                else:
-                                    print("Already paused")
-                                last_action_time = now
-                            elif direction == "Right" and fingers[0]:
-                                print
-                                pyautogui.hotkey("shift", "n")
-                                pyautogui.press("nexttrack")
-                        else:
-                            trail.clear()
-                            cv2.putText(frame, "Idle: Hand stationary", (10, 80),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-
-                if direction:
-                    cv2.putText(frame, f"Gesture: {direction}", (10, 50),
-                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-    else:
-        hand_was_present = False
-
-    cv2.imshow("Gesture App Switcher", frame)
-    if cv2.waitKey(1) & 0xFF == 27:
-        break
-
-cap.release()
-cv2.destroyAllWindows()
+        if len(self.trail) == self.trail.maxlen:
+            x1, y1 = self.trail[0]
+            x2, y2 = self.trail[-1]
+            dx, dy = x2 - x1, y2 - y1
+            distance = math.hypot(dx, dy)
+
+            cv2.putText(frame, f"Movement: {int(distance)} px", (10, 110),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+
+            direction = SWIPE_DIRECTIONS.classify(dx, dy)
+
+            now = time.time()
+            if now - self.last_action_time > cooldown:
+                # Check if all fingers are up
+                if finger_count == 5:
+                    if distance > idle_threshold:
+                        # Change application based on direction
+                        if direction == "Right":
+                            actions.append("next_app")
+                        elif direction == "Left":
+                            actions.append("previous_app")
+                        self.last_action_time = now
+                    else:
+                        # Idle state with all fingers up
+                        self.trail.clear()
+                        cv2.putText(frame, "Idle: All fingers up", (10, 80),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+                elif finger_count < 5:
+                    if distance > idle_threshold:
+                        # Perform actions based direction
+                        action = None
+                        if fingers[0]:
+                            action = {
+                                "Up": "volume_up",
+                                "Down": "volume_down",
+                                "Up-Right": "play",
+                                "Down-Left": "pause",
+                                "Right": "next_track",
+                            }.get(direction)
+                        if action:
+                            actions.append(action)
+                            self.last_action_time = now
+                    else:
+                        self.trail.clear()
+                        cv2.putText(frame, "Idle: Hand stationary", (10, 80),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+
+            if direction:
+                cv2.putText(frame, f"Gesture: {direction}", (10, 50),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
+        return True, actions
+
+    def dispatch(self, action):
+        """Perform an action picked by analyze(). Runs on the action thread."""
+        if action == "next_app":
+            print("Switching to next app (5-finger swipe)")
+            self.current_app_index = (self.current_app_index + 1) % len(apps)
+            switch_to(window_names[apps[self.current_app_index]])
+        elif action == "previous_app":
+            print("Switching to previous app (5-finger swipe)")
+            self.current_app_index = (self.current_app_index - 1) % len(apps)
+            switch_to(window_names[apps[self.current_app_index]])
+        elif action == "volume_up":
+            for _ in range(5):
+                pyautogui.press("volumeup")
+        elif action == "volume_down":
+            for _ in range(5):
+                pyautogui.press("volumedown")
+        elif action == "play":
+            if not self.media_playing:
+                pyautogui.press("playpause")
+                self.media_playing = True
+                print("Playing video")
+            else:
+                print("Already playing")
+        elif action == "pause":
+            if self.media_playing:
+                pyautogui.press("playpause")
+                self.media_playing = False
+                print("Pausing video")
+            else:
+                print("Already paused")
+        elif action == "next_track":
+            pyautogui.hotkey("shift", "n")
+            pyautogui.press("nexttrack")
+
+
+async def run(camera=0, headless=False, service=None):
+    switcher = AppSwitcher(detect=service is None)
+    analyze = switcher.analyze if service is None else switcher.analyze_event
+    pipeline = GesturePipeline(analyze, switcher.dispatch,
+                               "Gesture App Switcher", camera, headless, service=service)
+    try:
+        await pipeline.run()
+    finally:
+        if switcher.hands is not None:
+            switcher.hands.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Switch apps and control media with hand swipes")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--headless", action="store_true",
+                        help="run without a preview window (stop with Ctrl+C)")
+    parser.add_argument("--service", action="store_true",
+                        help="take hands from a running gesture_service.py instead of opening the camera")
+    parser.add_argument("--unix", help="gesture_service Unix socket path (implies --service)")
+    args = parser.parse_args()
+    service = (DEFAULT_HOST, DEFAULT_PORT, args.unix) if args.service or args.unix else None
+    try:
+        asyncio.run(run(args.camera, args.headless, service))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,143 @@
+import argparse
+import gc
+import importlib
+import os
+import sys
+import time
+import tracemalloc
+import tkinter as tk
+
+import cv2
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def rss_mb():
+    """Current resident set size of this process in MB."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2**20
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        raise RuntimeError("measuring RSS needs psutil on this platform (pip install psutil)")
+
+
+class LoopingCapture:
+    """Wraps a cv2.VideoCapture on a recorded video so it rewinds at the end instead of failing."""
+
+    def __init__(self, cap):
+        self.cap = cap
+        self.loops = 0
+
+    def read(self, *args):
+        ret, frame = self.cap.read(*args)
+        if not ret:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self.loops += 1
+            ret, frame = self.cap.read(*args)
+        return ret, frame
+
+    def grab(self):
+        if self.cap.grab():
+            return True
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.loops += 1
+        return self.cap.grab()
+
+    def retrieve(self, *args):
+        return self.cap.retrieve(*args)
+
+    def release(self):
+        self.cap.release()
+
+
+def soak(app_module, video, hours, fps, sample_every, warmup, max_growth_mb, countdown_every, top, trace):
+    total_frames = int(hours * 3600 * fps)
+    module = importlib.import_module(app_module)
+
+    root = tk.Tk()
+    app = module.GestureApp(root, source=video)
+    if not app.cap.isOpened():
+        raise RuntimeError(f"Could not open video '{video}'")
+    # Drive frames ourselves as fast as they can be processed
+    root.after_cancel(app.update_job)
+    app.cap = LoopingCapture(app.cap)
+
+    if trace:
+        tracemalloc.start(10)
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+    baseline_rss = None
+    baseline_snapshot = None
+    samples = []
+    start = time.perf_counter()
+    print(f"Soaking {app_module}.GestureApp for {total_frames} frames "
+          f"({hours:g} h at {fps:g} fps) from '{video}'")
+
+    try:
+        for frame_index in range(1, total_frames + 1):
+            if app.process_frame() is None:
+                raise RuntimeError("Could not read a frame from the video")
+            if countdown_every and frame_index % countdown_every == 0:
+                app.start_countdown()
+            # Run pending Tk work: redraws and any after() callbacks that are due
+            root.update()
+
+            if frame_index % sample_every and frame_index != total_frames:
+                continue
+            gc.collect()
+            rss = rss_mb()
+            traced = tracemalloc.get_traced_memory()[0] / 2**20 if trace else 0.0
+            samples.append((frame_index, rss, traced))
+            elapsed = time.perf_counter() - start
+            print(f"frame {frame_index:>9} | simulated {frame_index / fps / 3600:6.2f} h | "
+                  f"RSS {rss:8.1f} MB | traced {traced:8.1f} MB | {frame_index / elapsed:6.1f} fps")
+
+            if baseline_rss is None and frame_index >= warmup:
+                # Caches, model buffers and Tk images settle during warm-up
+                baseline_rss = rss
+                if trace:
+                    baseline_snapshot = tracemalloc.take_snapshot().filter_traces(ignore)
+    finally:
+        app.close()
+
+    if baseline_rss is None:
+        print("Run ended before warm-up finished; no growth measured")
+        return True
+
+    growth = samples[-1][1] - baseline_rss
+    print(f"\nRSS grew {growth:+.1f} MB after warm-up (limit {max_growth_mb:g} MB)")
+
+    if trace and baseline_snapshot is not None:
+        snapshot = tracemalloc.take_snapshot().filter_traces(ignore)
+        print(f"Top {top} allocation sites by growth since warm-up:")
+        for stat in snapshot.compare_to(baseline_snapshot, "lineno")[:top]:
+            print(f"  {stat}")
+        tracemalloc.stop()
+
+    return growth <= max_growth_mb
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a GestureApp kiosk on a recorded video and check its memory stays bounded")
+    parser.add_argument("video", help="recorded camera footage to loop over")
+    parser.add_argument("--app", default="hand_detection", choices=["hand_detection", "airdraw"])
+    parser.add_argument("--hours", type=float, default=1.0, help="simulated running time")
+    parser.add_argument("--fps", type=float, default=30.0, help="camera rate the simulated hours are measured in")
+    parser.add_argument("--sample-every", type=int, default=1000, help="frames between memory samples")
+    parser.add_argument("--warmup", type=int, default=1000, help="frames before the baseline sample")
+    parser.add_argument("--max-growth-mb", type=float, default=50.0)
+    parser.add_argument("--countdown-every", type=int, default=600,
+                        help="start a game countdown every N frames (0 to disable)")
+    parser.add_argument("--top", type=int, default=10, help="allocation sites to report")
+    parser.add_argument("--no-tracemalloc", dest="trace", action="store_false",
+                        help="only sample RSS (tracemalloc slows the run down)")
+    args = parser.parse_args()
+
+    ok = soak(args.app, args.video, args.hours, args.fps, args.sample_every, args.warmup,
+              args.max_growth_mb, args.countdown_every, args.top, args.trace)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,96 @@
+import numpy as np
+
+EIGHT_WAY = ["Right", "Up-Right", "Up", "Up-Left", "Left", "Down-Left", "Down", "Down-Right"]
+FOUR_WAY = ["Right", "Up", "Left", "Down"]
+
+
+class DirectionClassifier:
+    """Maps a swipe vector (dx, dy) in image coordinates to a direction sector.
+
+    Sector 0 is centred on "Right" and sectors go counter-clockwise, each
+    360 / sectors degrees wide. No trigonometry runs per swipe: the vector
+    is folded into one of 8 half-quadrants with sign and |dx| vs |dy|
+    comparisons, and the ratio of its smaller to its larger component
+    indexes a table of sector numbers built once up front. With the
+    default resolution, directions within about 0.03 degrees of a sector
+    boundary may land on either side.
+
+    Swipes shorter than or equal to `min_distance` pixels have no direction.
+    Swipes within `angular_dead_zone` degrees of a sector boundary have none
+    either, which stops noisy diagonal swipes from flickering between
+    neighbouring sectors.
+    """
+
+    def __init__(self, sectors=8, labels=None, min_distance=0, angular_dead_zone=0.0, resolution=1024):
+        if labels is None:
+            labels = {8: EIGHT_WAY, 4: FOUR_WAY}.get(sectors, [str(i) for i in range(sectors)])
+        if len(labels) != sectors:
+            raise ValueError(f"expected {sectors} labels, got {len(labels)}")
+        self.sectors = sectors
+        self.labels = list(labels)
+        self.min_distance_sq = min_distance * min_distance
+        self.resolution = resolution
+        self.table = self._build_table(sectors, angular_dead_zone, resolution)
+        self._rows = self.table.tolist()
+
+    @staticmethod
+    def _build_table(sectors, dead_zone, resolution):
+        # Rows are indexed by quadrant * 2 + steep (|up| > |dx|), columns by
+        # round(ratio * resolution) where ratio = min(|dx|, |up|) / max(...)
+        width = 360 / sectors
+        table = np.empty((8, resolution + 1), dtype=np.int16)
+        ratios = np.arange(resolution + 1) / resolution
+        phi = np.degrees(np.arctan(ratios))
+        for quadrant in range(4):
+            for steep in range(2):
+                within = 90 - phi if steep else phi
+                angle = (quadrant * 90 + (90 - within if quadrant % 2 else within)) % 360
+                shifted = (angle + width / 2) % 360
+                sector = (shifted // width).astype(np.int16) % sectors
+                offset = shifted - sector * width
+                near_edge = (offset < dead_zone) | (offset > width - dead_zone)
+                table[quadrant * 2 + steep] = np.where(near_edge, -1, sector)
+        return table
+
+    def classify(self, dx, dy):
+        """Label for one swipe, or None. dy grows downwards, as in image pixels."""
+        if dx * dx + dy * dy <= self.min_distance_sq:
+            return None
+        up = -dy
+        ax = dx if dx >= 0 else -dx
+        ay = up if up >= 0 else -up
+        if up >= 0:
+            quadrant = 0 if dx >= 0 else 1
+        else:
+            quadrant = 3 if dx >= 0 else 2
+        if ay > ax:
+            row = quadrant * 2 + 1
+            index = int(ax / ay * self.resolution + 0.5)
+        else:
+            row = quadrant * 2
+            index = int(ay / ax * self.resolution + 0.5)
+        sector = self._rows[row][index]
+        return self.labels[sector] if sector >= 0 else None
+
+    def classify_array(self, dx, dy):
+        """Sector index for every swipe in two arrays, -1 where there is no direction."""
+        dx = np.asarray(dx, dtype=float)
+        up = -np.asarray(dy, dtype=float)
+        ax = np.abs(dx)
+        ay = np.abs(up)
+        quadrant = np.where(up >= 0, np.where(dx >= 0, 0, 1), np.where(dx >= 0, 3, 2))
+        steep = ay > ax
+        small = np.where(steep, ax, ay)
+        large = np.where(steep, ay, ax)
+        ratio = np.divide(small, large, out=np.zeros_like(small), where=large > 0)
+        index = (ratio * self.resolution + 0.5).astype(np.intp)
+        sectors = self.table[quadrant * 2 + steep, index]
+        too_short = (dx * dx + up * up <= self.min_distance_sq) | (large == 0)
+        return np.where(too_short, -1, sectors)
+
+    def classify_trails(self, trails):
+        """Sector index per trail for an (N, T, 2) array of (x, y) points, from first to last point."""
+        trails = np.asarray(trails)
+        delta = trails[:, -1, :] - trails[:, 0, :]
+        return self.classify_array(delta[:, 0], delta[:, 1])
+
@@ -0,0 +1,243 @@
+import glob
+import os
+from collections import deque
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+# MediaPipe setup
+mp_drawing = mp.solutions.drawing_utils
+mphands = mp.solutions.hands
+
+TRAJECTORY_DIR = "trajectories"
+RESAMPLE_LENGTH = 32
+
+# Keys for recording templates in the capture tool below
+TRAJECTORY_KEYS = {
+    'c': "circle",
+    'z': "zigzag",
+    'p': "pinch",
+}
+
+
+def trajectory_features(landmarks):
+    """Per-frame feature vector: index fingertip x, y and the thumb-index pinch gap.
+
+    The pinch gap is divided by the wrist to middle-MCP length so it doesn't
+    depend on how far the hand is from the camera.
+    """
+    landmarks = np.asarray(landmarks, dtype=float).reshape(-1, 3)
+    hand_size = np.linalg.norm(landmarks[9, :2] - landmarks[0, :2])
+    pinch = np.linalg.norm(landmarks[8, :2] - landmarks[4, :2])
+    if hand_size > 0:
+        pinch /= hand_size
+    return np.array([landmarks[8, 0], landmarks[8, 1], pinch])
+
+
+def normalize_trajectory(points, length=RESAMPLE_LENGTH, min_extent=0.05):
+    """Resample a (T, 3) feature sequence to `length` frames and remove position/size.
+
+    The fingertip path is centred and scaled by its larger side, but never by
+    less than `min_extent`, so a hand that is merely jittering in place stays
+    small instead of being blown up into a shape.
+    """
+    points = np.asarray(points, dtype=float)
+    src = np.linspace(0, 1, len(points))
+    dst = np.linspace(0, 1, length)
+    resampled = np.column_stack([np.interp(dst, src, points[:, d]) for d in range(points.shape[1])])
+
+    xy = resampled[:, :2]
+    xy -= xy.mean(axis=0)
+    extent = np.max(xy.max(axis=0) - xy.min(axis=0))
+    xy /= max(extent, min_extent)
+    return resampled
+
+
+def envelope(series, band):
+    """Upper and lower LB_Keogh envelopes of a (L, D) series for a Sakoe-Chiba band."""
+    padded = np.pad(series, ((band, band), (0, 0)), mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * band + 1, axis=0)
+    return windows.max(axis=-1), windows.min(axis=-1)
+
+
+def lb_keogh(query, upper, lower):
+    """Squared LB_Keogh bound of `query` against stacked (K, L, D) envelopes."""
+    above = np.maximum(query - upper, 0)
+    below = np.maximum(lower - query, 0)
+    return np.sum(above * above + below * below, axis=(1, 2))
+
+
+def dtw(query, template, band, abandon_at=np.inf):
+    """Squared DTW cost within a Sakoe-Chiba band, or inf once it must exceed abandon_at."""
+    n = len(query)
+    prev = np.full(n + 1, np.inf)
+    prev[0] = 0.0
+    for i in range(1, n + 1):
+        lo = max(1, i - band)
+        hi = min(n, i + band)
+        cost = np.sum((template[lo - 1:hi] - query[i - 1]) ** 2, axis=1)
+        curr = np.full(n + 1, np.inf)
+        for j in range(lo, hi + 1):
+            curr[j] = cost[j - lo] + min(prev[j], prev[j - 1], curr[j - 1])
+        # Every warping path crosses this row, so its cheapest cell bounds the total
+        if curr[lo:hi + 1].min() > abandon_at:
+            return np.inf
+        prev = curr
+    return prev[n]
+
+
+class TrajectoryRecognizer:
+    """Matches a rolling window of hand features against recorded templates.
+
+    Templates are compared with banded DTW. Before any DTW runs, LB_Keogh
+    lower bounds against every template are computed in one vectorised pass;
+    templates are then tried in bound order, each DTW abandons as soon as it
+    can't beat the best match so far, and the search stops when the next
+    bound is already worse. Distances are RMS per resampled frame.
+    """
+
+    def __init__(self, window=24, length=RESAMPLE_LENGTH, band=3, threshold=0.15, stride=2):
+        self.window = window
+        self.length = length
+        self.band = band
+        self.threshold = threshold
+        self.stride = stride
+
+        self.buffer = deque(maxlen=window)
+        self.frames_since_match = 0
+        self.names = []
+        self.templates = np.empty((0, length, 3))
+        self.upper = np.empty((0, length, 3))
+        self.lower = np.empty((0, length, 3))
+
+    def add_template(self, name, points):
+        template = normalize_trajectory(points, self.length)
+        upper, lower = envelope(template, self.band)
+        self.names.append(name)
+        self.templates = np.concatenate([self.templates, template[None]])
+        self.upper = np.concatenate([self.upper, upper[None]])
+        self.lower = np.concatenate([self.lower, lower[None]])
+
+    def load_templates(self, directory=TRAJECTORY_DIR):
+        files = sorted(glob.glob(os.path.join(directory, "*_trajectory*.npy")))
+        for f in files:
+            name = os.path.basename(f).split("_trajectory")[0]
+            self.add_template(name, np.load(f))
+        return len(files)
+
+    def match(self, points):
+        """Return (name, distance) of the closest template, or (None, inf) if none is close enough."""
+        if not self.names:
+            return None, np.inf
+        query = normalize_trajectory(points, self.length)
+        bounds = lb_keogh(query, self.upper, self.lower)
+
+        # Work in squared total cost so nothing needs a sqrt until the end
+        best_cost = self.threshold ** 2 * self.length
+        best = None
+        for k in np.argsort(bounds):
+            if bounds[k] >= best_cost:
+                break
+            cost = dtw(query, self.templates[k], self.band, best_cost)
+            if cost < best_cost:
+                best_cost = cost
+                best = k
+
+        if best is None:
+            return None, np.inf
+        return self.names[best], np.sqrt(best_cost / self.length)
+
+    def push(self, landmarks):
+        """Add one frame of landmarks; returns (name, distance) when a gesture completes."""
+        self.buffer.append(trajectory_features(landmarks))
+        self.frames_since_match += 1
+        if len(self.buffer) < self.window or self.frames_since_match < self.stride:
+            return None, np.inf
+        self.frames_since_match = 0
+
+        name, distance = self.match(np.array(self.buffer))
+        if name is not None:
+            # Start fresh so the same movement doesn't fire again next frame
+            self.buffer.clear()
+        return name, distance
+
+    def reset(self):
+        self.buffer.clear()
+        self.frames_since_match = 0
+
+
+def get_next_filename(name):
+    """Find the next available template filename for a trajectory gesture."""
+    numbers = []
+    for file in glob.glob(os.path.join(TRAJECTORY_DIR, f"{name}_trajectory*.npy")):
+        try:
+            numbers.append(int(file.split("_trajectory")[-1].split(".")[0]))
+        except ValueError:
+            continue
+    next_number = max(numbers) + 1 if numbers else 1
+    return os.path.join(TRAJECTORY_DIR, f"{name}_trajectory{next_number}.npy")
+
+
+if __name__ == "__main__":
+    # Record templates: press a gesture key to start recording, the same key to
+    # save it. Live matches against the saved templates are shown throughout.
+    os.makedirs(TRAJECTORY_DIR, exist_ok=True)
+    recognizer = TrajectoryRecognizer()
+    print(f"Loaded {recognizer.load_templates()} trajectory templates")
+
+    cap = cv2.VideoCapture(0)
+    hands = mphands.Hands(max_num_hands=1)
+    recording = None
+    recorded = []
+    last_match = ""
+
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        frame = cv2.flip(frame, 1)
+        results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+        if results.multi_hand_landmarks:
+            hand_landmarks = results.multi_hand_landmarks[0]
+            mp_drawing.draw_landmarks(frame, hand_landmarks, mphands.HAND_CONNECTIONS)
+            landmarks = [[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark]
+            if recording:
+                recorded.append(trajectory_features(landmarks))
+            else:
+                name, distance = recognizer.push(landmarks)
+                if name:
+                    last_match = f"{name} ({distance:.3f})"
+                    print(f"Detected trajectory: {last_match}")
+        else:
+            recognizer.reset()
+
+        if recording:
+            cv2.putText(frame, f"Recording {recording}: {len(recorded)} frames", (10, 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+        elif last_match:
+            cv2.putText(frame, f"Trajectory: {last_match}", (10, 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+
+        cv2.imshow("Trajectory Recorder", frame)
+        key = cv2.waitKey(1) & 0xFF
+        if key == 27:
+            break
+        if chr(key) in TRAJECTORY_KEYS:
+            name = TRAJECTORY_KEYS[chr(key)]
+            if recording == name:
+                if len(recorded) > 1:
+                    filename = get_next_filename(name)
+                    np.save(filename, np.array(recorded))
+                    recognizer.add_template(name, np.array(recorded))
+                    print(f"Trajectory '{name}' saved as '{filename}'!")
+                recording = None
+            elif recording is None:
+                recording = name
+                recorded = []
+                recognizer.reset()
+
+    cap.release()
+    cv2.destroyAllWindows()